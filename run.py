@@ -11,10 +11,26 @@ import signal
 import yaml
 import json
 import os
+import pickle
+import stat
+from dataclasses import MISSING, fields
 from pathlib import Path
+from typing import Optional, Tuple
 
+from wol_proxy import __version__
 from wol_proxy.proxy_server import ProxyServer
-from wol_proxy.config import Config
+from wol_proxy.config import Config, ServiceConfig
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # Configure logging
 logging.basicConfig(
@@ -24,55 +40,127 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def load_config():
-    """Load configuration from Home Assistant add-on options"""
+OPTIONS_FILE = Path('/data/options.json')
+
+# Parsed Config cached across restarts, keyed by the options file's (mtime_ns, size)
+CONFIG_CACHE_FILE = Path('/data/.wol_proxy_cache.pkl')
+# Unpickling skips __post_init__, so a cached Config is only reused by the same
+# release with identical ServiceConfig fields and defaults
+_CACHE_VERSION = (__version__, tuple(
+    (f.name,) if f.default is MISSING else (f.name, repr(f.default)) for f in fields(ServiceConfig)
+))
+_CACHE_MIN_SIZE = 1024  # Smaller files parse faster than the cache round-trip
+
+def _read_cached_config(key: tuple) -> Optional[Config]:
+    """Return the cached Config if it was built from an identical options file"""
+    try:
+        with open(CONFIG_CACHE_FILE, 'rb') as f:
+            version, cached_key, config = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable config cache: {e}")
+        return None
+    
+    if version != _CACHE_VERSION or cached_key != key:
+        return None
+    return config
+
+def _write_cached_config(key: tuple, config: Config):
+    """Atomically replace the config cache"""
+    tmp_file = CONFIG_CACHE_FILE.with_suffix('.tmp')
+    try:
+        with open(tmp_file, 'wb') as f:
+            pickle.dump((_CACHE_VERSION, key, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, CONFIG_CACHE_FILE)
+    except OSError as e:
+        logger.debug(f"Could not write config cache: {e}")
+
+def _read_options() -> Tuple[tuple, Optional[bytes], Optional[Config]]:
+    """Read the options file; returns its fingerprint and either its bytes or a cached Config"""
+    with open(OPTIONS_FILE, 'rb') as f:
+        file_stat = os.fstat(f.fileno())
+        key = (file_stat.st_mtime_ns, file_stat.st_size)
+        if file_stat.st_size >= _CACHE_MIN_SIZE:
+            cached = _read_cached_config(key)
+            if cached is not None:
+                return key, None, cached
+        return key, f.read(), None
+
+def _load_yaml(path: Path):
+    """Parse a YAML file; run via asyncio.to_thread to keep the loop free"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+async def load_config():
+    """Load configuration from Home Assistant add-on options
+    
+    Outside the add-on, falls back to the YAML file named by the
+    WOL_PROXY_CONFIG environment variable (default: config-example.yaml).
+    """
     try:
         # Try to load from Home Assistant add-on options
-        options_file = Path('/data/options.json')
-        if options_file.exists():
+        try:
+            options = await asyncio.to_thread(_read_options)
+        except FileNotFoundError:
+            options = None
+        except PermissionError:
+            logger.error("Permission denied reading /data/options.json - add-on may need to run as root")
+            return None
+        
+        if options is not None:
+            key, data, cached = options
+            if cached is not None:
+                logger.info("Loaded configuration from cache (add-on options unchanged)")
+                return cached
+            
             try:
-                with open(options_file, 'r') as f:
-                    config_data = json.load(f)
-                logger.info("Loaded configuration from Home Assistant add-on options")
-                return Config(config_data)
-            except PermissionError:
-                logger.error("Permission denied reading /data/options.json - add-on may need to run as root")
-                return None
-            except json.JSONDecodeError as e:
+                config_data = json_loads(data)
+            except ValueError as e:
                 logger.error(f"Invalid JSON in /data/options.json: {e}")
                 return None
+            config = Config(config_data)
+            logger.info("Loaded configuration from Home Assistant add-on options")
+            
+            if key[1] >= _CACHE_MIN_SIZE:
+                await asyncio.to_thread(_write_cached_config, key, config)
+            return config
         else:
             # Fallback for development/testing
-            config_file = Path('config-example.yaml')
-            if config_file.exists():
-                with open(config_file, 'r') as f:
-                    config_data = yaml.safe_load(f)
-                config_data = config_data.get('options', {})
-                logger.info("Loaded configuration from config-example.yaml (development mode)")
-                return Config(config_data)
-            else:
-                logger.error("No configuration file found (/data/options.json or config-example.yaml)")
+            config_file = Path(os.environ.get('WOL_PROXY_CONFIG', 'config-example.yaml'))
+            try:
+                config_data = await asyncio.to_thread(_load_yaml, config_file)
+            except FileNotFoundError:
+                logger.error(f"No configuration file found (/data/options.json or {config_file})")
                 return None
+            config_data = config_data.get('options', {})
+            logger.info(f"Loaded configuration from {config_file} (development mode)")
+            return Config(config_data)
     
     except Exception as e:
         logger.error(f"Failed to load configuration: {e}")
         return None
 
+def _log_options_permissions():
+    """Log ownership details of the options file to debug permission problems"""
+    try:
+        file_stat = OPTIONS_FILE.stat()
+    except FileNotFoundError:
+        return
+    logger.debug(f"/data/options.json permissions: {stat.filemode(file_stat.st_mode)}")
+    logger.debug(f"/data/options.json owner UID: {file_stat.st_uid}")
+    logger.debug(f"Current process UID: {os.getuid() if hasattr(os, 'getuid') else 'N/A'}")
+
 async def main():
     """Main application entry point"""
     logger.info("Starting WOL Proxy Add-on")
     
-    # Debug: Check file permissions
-    options_file = Path('/data/options.json')
-    if options_file.exists():
-        import stat
-        file_stat = options_file.stat()
-        logger.debug(f"/data/options.json permissions: {stat.filemode(file_stat.st_mode)}")
-        logger.debug(f"/data/options.json owner UID: {file_stat.st_uid}")
-        logger.debug(f"Current process UID: {os.getuid() if hasattr(os, 'getuid') else 'N/A'}")
+    # Debug: Check file permissions (skip the stat calls unless debug logging is on)
+    if logger.isEnabledFor(logging.DEBUG):
+        await asyncio.to_thread(_log_options_permissions)
     
     # Load configuration
-    config = load_config()
+    config = await load_config()
     if not config:
         logger.error("Failed to load configuration, exiting")
         sys.exit(1)
@@ -100,8 +188,9 @@ async def main():
         shutdown_event.set()
     
     # Register signal handlers
+    loop = asyncio.get_running_loop()
     for sig in (signal.SIGTERM, signal.SIGINT):
-        asyncio.get_event_loop().add_signal_handler(sig, signal_handler)
+        loop.add_signal_handler(sig, signal_handler)
     
     try:
         await proxy_server.start()
@@ -118,4 +207,14 @@ async def main():
         logger.info("WOL Proxy stopped")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Prefer the libuv-based event loop when it is installed
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        if sys.version_info >= (3, 12):
+            asyncio.run(main(), loop_factory=uvloop.new_event_loop)
+        else:
+            uvloop.install()
+            asyncio.run(main())
@@ -7,6 +7,7 @@ Run this locally to test the proxy functionality
 import asyncio
 import json
 import logging
+import signal
 import sys
 from pathlib import Path
 
@@ -27,13 +28,19 @@ logger = logging.getLogger(__name__)
 def load_dev_config():
     """Load configuration for development"""
     config_file = Path('config-example.yaml')
-    if not config_file.exists():
-        logger.error("config-example.yaml not found")
-        return None
     
     import yaml
-    with open(config_file, 'r') as f:
-        config_data = yaml.safe_load(f)
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    
+    try:
+        with open(config_file, 'r') as f:
+            config_data = yaml.load(f, Loader=SafeLoader)
+    except FileNotFoundError:
+        logger.error("config-example.yaml not found")
+        return None
     
     # Extract options
     options = config_data.get('options', {})
@@ -59,16 +66,25 @@ async def main():
     # Create and start proxy server
     proxy_server = ProxyServer(config)
     
+    # Wait on an event set by the signal handlers instead of polling
+    shutdown_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    try:
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, shutdown_event.set)
+    except NotImplementedError:
+        # Windows event loops have no signal handlers; Ctrl+C interrupts the wait below instead
+        pass
+    
     try:
         await proxy_server.start()
         print("✅ WOL Proxy started successfully")
         print("\nPress Ctrl+C to stop")
         
-        # Keep running
-        while True:
-            await asyncio.sleep(1)
-            
-    except KeyboardInterrupt:
+        await shutdown_event.wait()
+        print("\n🛑 Stopping proxy server...")
+        
+    except (KeyboardInterrupt, asyncio.CancelledError):
         print("\n🛑 Stopping proxy server...")
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -77,5 +93,22 @@ async def main():
         await proxy_server.stop()
         print("✅ Proxy server stopped")
 
+def run():
+    """Run main() on uvloop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        if sys.version_info >= (3, 12):
+            asyncio.run(main(), loop_factory=uvloop.new_event_loop)
+        else:
+            uvloop.install()
+            asyncio.run(main())
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        run()
+    except KeyboardInterrupt:
+        # Ctrl+C that arrives outside main()'s wait, e.g. while starting up
+        pass
@@ -3,11 +3,19 @@ Configuration management for WOL Proxy
 """
 
 import logging
-from dataclasses import dataclass
-from typing import List, Optional
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Six hex octets, either bare or separated consistently by ':' or '-'
+_MAC_RE = re.compile(r"[0-9A-Fa-f]{2}([:-]?)[0-9A-Fa-f]{2}(?:\1[0-9A-Fa-f]{2}){4}")
+
+_MAC_SEPARATORS = str.maketrans("", "", ":-")
+
+_VALID_PROTOCOLS = frozenset(("tcp", "udp"))
+
 @dataclass
 class ServiceConfig:
     """Configuration for a single proxied service"""
@@ -19,6 +27,9 @@ class ServiceConfig:
     health_check_interval: int = 2
     connection_timeout: int = 10
     protocol: str = "tcp"
+    tcp_nodelay: bool = True
+    socket_buffer_size: int = 0  # 0 leaves buffer sizing to kernel autotuning
+    mac_bytes: bytes = field(init=False, repr=False)  # Parsed once for magic packets
     
     def __post_init__(self):
         """Validate configuration after initialization"""
@@ -35,11 +46,11 @@ class ServiceConfig:
             raise ValueError("mac_address is required")
         
         # Validate MAC address format
-        mac_parts = self.mac_address.replace(":", "").replace("-", "")
-        if len(mac_parts) != 12 or not all(c in "0123456789abcdefABCDEF" for c in mac_parts):
+        if not _MAC_RE.fullmatch(self.mac_address):
             raise ValueError("Invalid MAC address format")
+        self.mac_bytes = bytes.fromhex(self.mac_address.translate(_MAC_SEPARATORS))
         
-        if self.protocol not in ["tcp", "udp"]:
+        if self.protocol not in _VALID_PROTOCOLS:
             raise ValueError("protocol must be 'tcp' or 'udp'")
         
         if not (30 <= self.wake_timeout <= 300):
@@ -50,6 +61,9 @@ class ServiceConfig:
         
         if not (1 <= self.connection_timeout <= 60):
             raise ValueError("connection_timeout must be between 1 and 60 seconds")
+        
+        if not (0 <= self.socket_buffer_size <= 16777216):
+            raise ValueError("socket_buffer_size must be between 0 and 16777216 bytes")
 
 class Config:
     """Main configuration class"""
@@ -71,10 +85,15 @@ class Config:
         
         if not self.services:
             logger.warning("No services configured")
+        
+        # Index services by proxy port for O(1) lookups
+        self._by_port: Dict[int, ServiceConfig] = {}
+        for service in self.services:
+            if service.proxy_port in self._by_port:
+                logger.error(f"Duplicate proxy_port {service.proxy_port} in service configuration")
+                raise ValueError(f"proxy_port {service.proxy_port} is configured more than once")
+            self._by_port[service.proxy_port] = service
     
     def get_service_by_port(self, port: int) -> Optional[ServiceConfig]:
         """Get service configuration by proxy port"""
-        for service in self.services:
-            if service.proxy_port == port:
-                return service
-        return None
+        return self._by_port.get(port)
@@ -0,0 +1,50 @@
+"""
+TCP availability probes
+"""
+
+import asyncio
+import logging
+import socket
+import struct
+
+from .proxy import ResolvedTarget
+
+logger = logging.getLogger(__name__)
+
+# SO_LINGER enabled with a zero timeout
+_LINGER_ABORT = struct.pack('ii', 1, 0)
+
+async def tcp_probe(target: ResolvedTarget, timeout: float = 5) -> bool:
+    """
+    Check if a target accepts TCP connections on its port
+    
+    Connects a bare non-blocking socket and closes it again, so no
+    transport, protocol or stream objects are created per probe. The
+    target's cached addresses are used, and a failed probe marks them for
+    refreshing just like a failed proxied connection does.
+    
+    Args:
+        target: The service's TCPProxy or UDPProxy
+        timeout: Maximum time for resolution plus connect
+    
+    Returns:
+        True if the connection was accepted, False otherwise
+    """
+    try:
+        sock = await asyncio.wait_for(target.connect_stream(), timeout=timeout)
+    except (asyncio.TimeoutError, OSError):
+        target.mark_failed()
+        return False
+    except Exception as e:
+        logger.debug(f"Unexpected error checking {target.target_host}:{target.target_port}: {e}")
+        return False
+    
+    try:
+        # Abort with RST on close: no FIN exchange and no TIME_WAIT left behind
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_ABORT)
+    except OSError:
+        pass
+    finally:
+        sock.close()
+    target.mark_ok()
+    return True
@@ -3,43 +3,207 @@ TCP Proxy implementation
 """
 
 import asyncio
+import errno
 import logging
+import os
 import socket
-from typing import Optional
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
-class TCPProxy:
-    """TCP proxy that forwards connections between client and target"""
+# Backoff bounds (seconds) for refreshing a cached target address after failures
+RESOLVE_BACKOFF_MIN = 1.0
+RESOLVE_BACKOFF_MAX = 60.0
+
+# Packets buffered per UDP client while its target endpoint is being opened
+MAX_PENDING_PACKETS = 64
+
+# Read size for the stream forwarding path, matching a typical socket buffer
+_FORWARD_CHUNK = 1 << 16
+
+# splice(2) moves at most one pipe's worth (64 KiB by default) per call
+_SPLICE_CHUNK = 1 << 16
+_SPLICE_FLAGS = getattr(os, "SPLICE_F_MOVE", 0) | getattr(os, "SPLICE_F_NONBLOCK", 0)
+_HAVE_SPLICE = hasattr(os, "splice")
+
+async def _wait_fd(loop: asyncio.AbstractEventLoop, fd: int, writable: bool):
+    """Wait until a raw file descriptor is readable or writable"""
+    ready = loop.create_future()
+    
+    def on_ready():
+        if not ready.done():
+            ready.set_result(None)
+    
+    if writable:
+        loop.add_writer(fd, on_ready)
+    else:
+        loop.add_reader(fd, on_ready)
+    try:
+        await ready
+    finally:
+        if writable:
+            loop.remove_writer(fd)
+        else:
+            loop.remove_reader(fd)
+
+def _drain_pipe(pipe_r: int, count: int) -> bytes:
+    """Read count bytes back out of a pipe that splice(2) filled"""
+    chunks = []
+    while count:
+        chunk = os.read(pipe_r, count)
+        chunks.append(chunk)
+        count -= len(chunk)
+    return b"".join(chunks)
+
+class ResolvedTarget:
+    """A target host and port whose resolved addresses are cached so connections skip getaddrinfo
+    
+    Base class of TCPProxy and UDPProxy; also used on its own as a TCP probe target.
+    """
+    
+    sock_type = socket.SOCK_STREAM
     
     def __init__(self, target_host: str, target_port: int):
         self.target_host = target_host
         self.target_port = target_port
+        # (family, sockaddr) per getaddrinfo result, the last one that worked first
+        self._target_addrs: Optional[List[Tuple[int, tuple]]] = None
+        self._resolve_stale = False
+        self._resolve_at = 0.0
+        self._resolve_backoff = RESOLVE_BACKOFF_MIN
+        # Cached so hot paths skip building debug messages that would be discarded
+        self._debug = logger.isEnabledFor(logging.DEBUG)
+    
+    async def resolve(self):
+        """Resolve the target and cache every address it maps to"""
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            self.target_host, self.target_port, type=self.sock_type
+        )
+        self._target_addrs = [(family, sockaddr) for family, _, _, _, sockaddr in infos]
+        self._resolve_stale = False
+        logger.debug(f"Resolved {self.target_host}:{self.target_port} to "
+                     f"{[sockaddr for _, sockaddr in self._target_addrs]}")
+    
+    async def _get_target(self) -> List[Tuple[int, tuple]]:
+        """Return the cached (family, sockaddr) list, refreshing it if due"""
+        if self._target_addrs is None or (
+            self._resolve_stale and asyncio.get_running_loop().time() >= self._resolve_at
+        ):
+            await self.resolve()
+        return self._target_addrs
+    
+    def mark_failed(self):
+        """Mark the cached addresses stale and back off before refreshing them"""
+        if self._resolve_stale:
+            return
+        self._resolve_stale = True
+        self._resolve_at = asyncio.get_running_loop().time() + self._resolve_backoff
+        self._resolve_backoff = min(self._resolve_backoff * 2, RESOLVE_BACKOFF_MAX)
+    
+    def mark_ok(self):
+        """Reset the refresh backoff after a successful exchange with the target"""
+        self._resolve_stale = False
+        self._resolve_backoff = RESOLVE_BACKOFF_MIN
+    
+    def _address_failed(self, sockaddr: tuple):
+        """Move an address that did not answer behind the others"""
+        addrs = self._target_addrs
+        if addrs is None or len(addrs) < 2:
+            return
+        for entry in addrs:
+            if entry[1] == sockaddr:
+                addrs.remove(entry)
+                addrs.append(entry)
+                break
+    
+    async def connect_stream(self, tune: Optional[Callable[[socket.socket], None]] = None) -> socket.socket:
+        """Connect a non-blocking TCP socket to the first target address that accepts
+        
+        Addresses are tried in order, like asyncio.open_connection does, so a
+        dual-stack name still works when the service only listens on one family.
+        """
+        loop = asyncio.get_running_loop()
+        addrs = await self._get_target()
+        error: Optional[OSError] = None
+        # Iterate over a snapshot: concurrent connects reorder the shared list
+        for entry in list(addrs):
+            family, sockaddr = entry
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                sock.setblocking(False)
+                if tune is not None:
+                    tune(sock)
+                await loop.sock_connect(sock, sockaddr)
+            except OSError as e:
+                sock.close()
+                error = e
+                continue
+            except BaseException:
+                sock.close()
+                raise
+            
+            if addrs[0] != entry and entry in addrs:
+                # Start with the address that answered next time
+                addrs.remove(entry)
+                addrs.insert(0, entry)
+            return sock
+        
+        raise error
+
+class TCPProxy(ResolvedTarget):
+    """TCP proxy that forwards connections between client and target"""
+    
+    def __init__(self, target_host: str, target_port: int):
+        super().__init__(target_host, target_port)
         self.active_connections = 0
         self.connection_timeout = 10  # Default timeout
+        self.tcp_nodelay = True
+        self.socket_buffer_size = 0  # 0 keeps kernel autotuning
+        self._client_tasks: Set[asyncio.Task] = set()  # Handlers started by TCPProxyProtocol
     
-    async def handle_client(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
-        """Handle a client connection"""
-        client_addr = client_writer.get_extra_info('peername')
-        logger.debug(f"New TCP client connection from {client_addr}")
+    async def handle_client(self, client_sock: socket.socket, client_addr: Optional[tuple]) -> bool:
+        """Handle a client connection handed over by TCPProxyProtocol
         
-        target_reader = None
+        Returns:
+            True if the target connection was established, False otherwise
+        """
+        if self._debug:
+            logger.debug(f"New TCP client connection from {client_addr}")
+        
+        target_sock = None
+        client_writer = None
         target_writer = None
+        connected = False
         
         try:
             self.active_connections += 1
             
-            # Connect to target with timeout
+            # Connect to the cached target address with timeout
             try:
-                target_reader, target_writer = await asyncio.wait_for(
-                    asyncio.open_connection(self.target_host, self.target_port),
-                    timeout=self.connection_timeout
-                )
+                target_sock = await self._connect_target()
             except asyncio.TimeoutError:
+                self.mark_failed()
                 logger.error(f"Timeout connecting to target {self.target_host}:{self.target_port}")
-                return
+                return False
+            except OSError:
+                self.mark_failed()
+                raise
+            
+            self.mark_ok()
+            connected = True
+            self._tune_socket(client_sock)
+            if self._debug:
+                logger.debug(f"Connected to target {self.target_host}:{self.target_port}")
+            
+            # Zero-copy path: bytes move socket->pipe->socket inside the kernel
+            if _HAVE_SPLICE and await self._splice_connection(client_sock, target_sock):
+                return connected
             
-            logger.debug(f"Connected to target {self.target_host}:{self.target_port}")
+            client_reader, client_writer = await asyncio.open_connection(sock=client_sock)
+            client_sock = None  # Now owned by client_writer
+            target_reader, target_writer = await asyncio.open_connection(sock=target_sock)
+            target_sock = None  # Now owned by target_writer
             
             # Start bidirectional forwarding
             await asyncio.gather(
@@ -54,56 +218,189 @@ class TCPProxy:
             self.active_connections -= 1
             
             # Close connections
-            if target_writer:
+            for sock in (client_sock, target_sock):
+                if sock is not None:
+                    sock.close()
+            
+            # Close both sides and wait for them concurrently
+            writers = [w for w in (client_writer, target_writer) if w is not None]
+            for writer in writers:
+                writer.close()
+            results = await asyncio.gather(*(w.wait_closed() for w in writers), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.debug(f"Error closing connection: {result}")
+            
+            if self._debug:
+                logger.debug(f"Closed TCP connection from {client_addr}")
+        
+        return connected
+    
+    async def _connect_target(self) -> socket.socket:
+        """Connect a non-blocking socket to the target without re-resolving its address"""
+        # Buffer sizes must be set before connecting to affect window scaling
+        return await asyncio.wait_for(
+            self.connect_stream(tune=self._tune_socket),
+            timeout=self.connection_timeout
+        )
+    
+    def _tune_socket(self, sock):
+        """Apply the service's Nagle, keepalive and buffer settings to a socket"""
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1 if self.tcp_nodelay else 0)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if self.socket_buffer_size:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.socket_buffer_size)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.socket_buffer_size)
+        except OSError as e:
+            logger.debug(f"Could not set socket options: {e}")
+    
+    async def _splice_connection(self, client_sock: socket.socket, target_sock: socket.socket) -> bool:
+        """Forward both directions with splice(2) instead of copying through Python
+        
+        Returns:
+            False if the sockets can't be spliced (EINVAL on the first splice of
+            a direction); the caller then forwards through streams instead
+        """
+        loop = asyncio.get_running_loop()
+        pipes = []
+        try:
+            # The first splice of each direction decides whether this connection can use
+            # the zero-copy path. Anything it moves stays queued in the pipe.
+            started = []
+            for src, dst, direction in ((client_sock, target_sock, "client->target"),
+                                        (target_sock, client_sock, "target->client")):
+                pipe_r, pipe_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+                pipes += (pipe_r, pipe_w)
                 try:
-                    target_writer.close()
-                    await target_writer.wait_closed()
-                except Exception as e:
-                    logger.debug(f"Error closing target connection: {e}")
+                    queued = os.splice(src.fileno(), pipe_w, _SPLICE_CHUNK, flags=_SPLICE_FLAGS)
+                except BlockingIOError:
+                    queued = None  # Nothing to read yet
+                except OSError as e:
+                    if e.errno != errno.EINVAL:
+                        raise
+                    logger.debug(f"splice(2) not supported for this connection, using stream forwarding: {e}")
+                    # Deliver what an earlier direction already pulled into its pipe
+                    for _, earlier_dst, earlier_pipe_r, _, earlier_queued, _ in started:
+                        if earlier_queued:
+                            await loop.sock_sendall(earlier_dst, _drain_pipe(earlier_pipe_r, earlier_queued))
+                    return False
+                started.append((src, dst, pipe_r, pipe_w, queued, direction))
             
+            await asyncio.gather(
+                *(self._splice_data(*args) for args in started),
+                return_exceptions=True
+            )
+            return True
+        finally:
+            for fd in pipes:
+                os.close(fd)
+    
+    async def _splice_data(self, src: socket.socket, dst: socket.socket, pipe_r: int, pipe_w: int,
+                           queued: Optional[int], direction: str):
+        """Splice data from src to dst through a private pipe
+        
+        queued is the result of the first splice from src: bytes already in the
+        pipe, 0 at end of stream, or None if src had nothing to read yet.
+        """
+        loop = asyncio.get_running_loop()
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+        pending = queued
+        try:
+            while True:
+                if pending is None:
+                    try:
+                        pending = os.splice(src_fd, pipe_w, _SPLICE_CHUNK, flags=_SPLICE_FLAGS)
+                    except BlockingIOError:
+                        await _wait_fd(loop, src_fd, writable=False)
+                        continue
+                
+                if not pending:
+                    break
+                
+                forwarded = pending
+                while pending:
+                    try:
+                        pending -= os.splice(pipe_r, dst_fd, pending, flags=_SPLICE_FLAGS)
+                    except BlockingIOError:
+                        await _wait_fd(loop, dst_fd, writable=True)
+                pending = None
+                
+                if self._debug:
+                    logger.debug(f"Forwarded {forwarded} bytes ({direction})")
+                
+        except Exception as e:
+            logger.debug(f"Connection closed during forwarding ({direction}): {e}")
+        finally:
+            # Mirror the stream path, which closes the writer once either side ends
             try:
-                client_writer.close()
-                await client_writer.wait_closed()
-            except Exception as e:
-                logger.debug(f"Error closing client connection: {e}")
-            
-            logger.debug(f"Closed TCP connection from {client_addr}")
+                dst.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
     
     async def _forward_data(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, direction: str):
         """Forward data from reader to writer"""
         try:
             while True:
-                data = await reader.read(8192)
+                data = await reader.read(_FORWARD_CHUNK)
                 if not data:
                     break
                 
                 writer.write(data)
                 await writer.drain()
                 
-                logger.debug(f"Forwarded {len(data)} bytes ({direction})")
+                if self._debug:
+                    logger.debug(f"Forwarded {len(data)} bytes ({direction})")
                 
         except Exception as e:
             logger.debug(f"Connection closed during forwarding ({direction}): {e}")
         finally:
-            try:
-                writer.close()
-                await writer.wait_closed()
-            except Exception as e:
-                logger.debug(f"Error closing writer in {direction}: {e}")
+            # Closing ends the opposite direction too; handle_client awaits wait_closed()
+            writer.close()
+
+class TCPProxyProtocol(asyncio.Protocol):
+    """Accepts a TCP client and hands its socket to a handler before anything is read
+    
+    Unread client data stays in the kernel, so the splice path can move it
+    without Python ever buffering it.
+    """
+    
+    def __init__(self, proxy: TCPProxy, on_client: Callable[[socket.socket, Optional[tuple]], Awaitable[None]]):
+        self.proxy = proxy
+        self.on_client = on_client
+    
+    def connection_made(self, transport):
+        transport.pause_reading()
+        # Keep a duplicate of the socket and let the transport go; closing it only
+        # drops the original fd, the connection itself stays open
+        client_sock = socket.socket(fileno=os.dup(transport.get_extra_info('socket').fileno()))
+        client_sock.setblocking(False)
+        client_addr = transport.get_extra_info('peername')
+        transport.close()
+        
+        task = asyncio.create_task(self.on_client(client_sock, client_addr))
+        self.proxy._client_tasks.add(task)
+        task.add_done_callback(self.proxy._client_tasks.discard)
 
-class UDPProxy:
+class UDPProxy(ResolvedTarget):
     """UDP proxy that forwards packets between client and target"""
     
+    sock_type = socket.SOCK_DGRAM
+    
     def __init__(self, target_host: str, target_port: int):
-        self.target_host = target_host
-        self.target_port = target_port
-        self.client_map = {}  # Maps client addresses to target sockets
+        super().__init__(target_host, target_port)
+        # Maps client addresses to [target transport, last seen], least recently used first
+        self.client_map: "OrderedDict[tuple, list]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None  # Set in start()
+        self._pending: Dict[tuple, List[bytes]] = {}  # Packets waiting for a target endpoint
+        self._open_tasks: Set[asyncio.Task] = set()  # In-flight _open_target calls
         self.cleanup_task = None
         self.max_connections = 100  # Limit concurrent UDP connections
     
     async def start(self, bind_port: int):
         """Start the UDP proxy server"""
-        self.transport, self.protocol = await asyncio.get_event_loop().create_datagram_endpoint(
+        self._loop = asyncio.get_running_loop()
+        self.transport, self.protocol = await self._loop.create_datagram_endpoint(
             lambda: UDPProxyProtocol(self),
             local_addr=('0.0.0.0', bind_port)
         )
@@ -117,87 +414,109 @@ class UDPProxy:
         """Stop the UDP proxy server"""
         if self.cleanup_task:
             self.cleanup_task.cancel()
+        for task in self._open_tasks:
+            task.cancel()
         
-        for client_addr, (sock, _) in self.client_map.items():
-            sock.close()
+        for client_addr, (transport, _) in list(self.client_map.items()):
+            transport.close()
         
         self.client_map.clear()
+        self._pending.clear()
         
         if hasattr(self, 'transport'):
             self.transport.close()
     
-    async def handle_client_packet(self, data: bytes, client_addr: tuple):
+    def handle_client_packet(self, data: bytes, client_addr: tuple):
         """Handle a packet from a client"""
-        logger.debug(f"Received UDP packet from {client_addr}, {len(data)} bytes")
+        if self._debug:
+            logger.debug(f"Received UDP packet from {client_addr}, {len(data)} bytes")
         
         try:
-            # Check connection limit
-            if len(self.client_map) >= self.max_connections:
-                logger.warning(f"UDP connection limit reached ({self.max_connections}), dropping packet from {client_addr}")
+            entry = self.client_map.get(client_addr)
+            if entry is None:
+                # Queue packets until the client's target endpoint is open
+                pending = self._pending.get(client_addr)
+                if pending is None:
+                    self._pending[client_addr] = [data]
+                    task = self._loop.create_task(self._open_target(client_addr))
+                    self._open_tasks.add(task)
+                    task.add_done_callback(self._open_tasks.discard)
+                elif len(pending) < MAX_PENDING_PACKETS:
+                    pending.append(data)
+                else:
+                    logger.debug(f"Dropping UDP packet from {client_addr}, target endpoint not open yet")
                 return
             
-            # Get or create target socket for this client
-            if client_addr not in self.client_map:
-                target_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                self.client_map[client_addr] = (target_sock, asyncio.get_event_loop().time())
-                
-                # Start listening for responses from target
-                asyncio.create_task(self._listen_target_responses(target_sock, client_addr))
+            self.client_map.move_to_end(client_addr)
+            transport = entry[0]
+            entry[1] = self._loop.time()  # Update timestamp in place
             
-            target_sock, _ = self.client_map[client_addr]
-            self.client_map[client_addr] = (target_sock, asyncio.get_event_loop().time())  # Update timestamp
-            
-            # Forward packet to target
-            target_sock.sendto(data, (self.target_host, self.target_port))
-            logger.debug(f"Forwarded UDP packet to {self.target_host}:{self.target_port}")
+            # Forward packet to target over the connected socket. Sent immediately rather
+            # than batched with sendmmsg: the listener delivers one datagram per loop
+            # callback and each client has its own socket, so batches would hold one packet.
+            transport.sendto(data)
+            if self._debug:
+                logger.debug(f"Forwarded UDP packet to {self.target_host}:{self.target_port}")
             
         except Exception as e:
             logger.error(f"Error handling UDP packet from {client_addr}: {e}")
     
-    async def _listen_target_responses(self, target_sock, client_addr):
-        """Listen for responses from target and forward to client"""
+    async def _open_target(self, client_addr: tuple):
+        """Open a connected target endpoint for a new client and flush its queued packets"""
         try:
-            # Set socket to non-blocking mode for async operations
-            target_sock.setblocking(False)
-            
-            while True:
-                try:
-                    data, _ = await asyncio.get_event_loop().sock_recv(target_sock, 8192)
-                    
-                    # Forward response back to client
-                    self.transport.sendto(data, client_addr)
-                    logger.debug(f"Forwarded UDP response to {client_addr}, {len(data)} bytes")
-                except asyncio.TimeoutError:
-                    # No data received, continue listening
-                    continue
-                except (ConnectionResetError, OSError):
-                    # Target closed connection
-                    break
-                
+            transport = await self._connect_datagram(client_addr)
         except Exception as e:
-            logger.debug(f"Target response listener closed for {client_addr}: {e}")
-        finally:
-            if client_addr in self.client_map:
-                del self.client_map[client_addr]
-            target_sock.close()
+            self._pending.pop(client_addr, None)
+            logger.error(f"Error opening UDP target endpoint for {client_addr}: {e}")
+            return
+        
+        # The proxy may have been stopped while we were connecting
+        if self.transport.is_closing():
+            transport.close()
+            return
+        
+        # Evict the least recently used client to stay within the limit
+        if len(self.client_map) >= self.max_connections:
+            old_addr, (old_transport, _) = self.client_map.popitem(last=False)
+            old_transport.close()
+            logger.debug(f"UDP connection limit reached ({self.max_connections}), evicted {old_addr}")
+        
+        self.client_map[client_addr] = [transport, self._loop.time()]
+        for data in self._pending.pop(client_addr, ()):
+            transport.sendto(data)
+        logger.debug(f"Opened UDP target endpoint for {client_addr}")
+    
+    async def _connect_datagram(self, client_addr: tuple) -> asyncio.DatagramTransport:
+        """Open an endpoint connected to the first target address that accepts it"""
+        error: Optional[OSError] = None
+        for family, sockaddr in await self._get_target():
+            try:
+                transport, _ = await self._loop.create_datagram_endpoint(
+                    lambda: _TargetProtocol(self, client_addr, sockaddr),
+                    family=family,
+                    remote_addr=sockaddr[:2]  # asyncio only takes (host, port), even for IPv6
+                )
+            except OSError as e:
+                error = e
+                continue
+            return transport
+        raise error
     
     async def _cleanup_stale_connections(self):
         """Cleanup stale UDP connections"""
         while True:
             try:
                 await asyncio.sleep(60)  # Check every minute
-                current_time = asyncio.get_event_loop().time()
+                current_time = self._loop.time()
                 stale_timeout = 300  # 5 minutes
                 
-                stale_clients = []
-                for client_addr, (sock, timestamp) in self.client_map.items():
-                    if current_time - timestamp > stale_timeout:
-                        stale_clients.append(client_addr)
-                
-                for client_addr in stale_clients:
-                    sock, _ = self.client_map[client_addr]
-                    sock.close()
+                # Entries are kept in last-use order, so only the leading run can be stale
+                while self.client_map:
+                    client_addr, (transport, timestamp) = next(iter(self.client_map.items()))
+                    if current_time - timestamp <= stale_timeout:
+                        break
                     del self.client_map[client_addr]
+                    transport.close()
                     logger.debug(f"Cleaned up stale UDP connection for {client_addr}")
                     
             except asyncio.CancelledError:
@@ -205,6 +524,41 @@ class UDPProxy:
             except Exception as e:
                 logger.error(f"Error in UDP cleanup task: {e}")
 
+class _TargetProtocol(asyncio.DatagramProtocol):
+    """Connected UDP endpoint that relays target responses back to one client"""
+    
+    def __init__(self, proxy: UDPProxy, client_addr: tuple, sockaddr: tuple):
+        self.proxy = proxy
+        self.client_addr = client_addr
+        self.sockaddr = sockaddr
+        self.transport = None
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def datagram_received(self, data: bytes, addr: tuple):
+        """Forward a response from the target back to the client"""
+        self.proxy.transport.sendto(data, self.client_addr)
+        if self.proxy._resolve_stale:
+            self.proxy.mark_ok()
+        if self.proxy._debug:
+            logger.debug(f"Forwarded UDP response to {self.client_addr}, {len(data)} bytes")
+    
+    def error_received(self, exc: Exception):
+        if isinstance(exc, ConnectionRefusedError):
+            self.proxy.mark_failed()
+            if len(self.proxy._target_addrs or ()) > 1:
+                # Nothing listens on this address; reopen on the next one with the next packet
+                self.proxy._address_failed(self.sockaddr)
+                self.transport.close()
+        logger.debug(f"Target endpoint error for {self.client_addr}: {exc}")
+    
+    def connection_lost(self, exc: Optional[Exception]):
+        """Drop the client mapping once the target endpoint is closed"""
+        entry = self.proxy.client_map.get(self.client_addr)
+        if entry is not None and entry[0] is self.transport:
+            del self.proxy.client_map[self.client_addr]
+
 class UDPProxyProtocol(asyncio.DatagramProtocol):
     """UDP protocol handler for the proxy"""
     
@@ -213,4 +567,4 @@ class UDPProxyProtocol(asyncio.DatagramProtocol):
     
     def datagram_received(self, data: bytes, addr: tuple):
         """Handle received UDP datagram"""
-        asyncio.create_task(self.proxy.handle_client_packet(data, addr))
+        self.proxy.handle_client_packet(data, addr)
@@ -3,180 +3,302 @@ Main proxy server that coordinates WOL and proxy functionality
 """
 
 import asyncio
+import heapq
 import logging
-import socket
-from typing import Dict, List
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from .config import Config, ServiceConfig
 from .wol_manager import WOLManager
-from .proxy import TCPProxy, UDPProxy
+from .probe import tcp_probe
+from .proxy import TCPProxy, TCPProxyProtocol, UDPProxy, ResolvedTarget
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on health-check probes in flight across all services
+MAX_CONCURRENT_PROBES = 8
+
+# Seconds to turn clients away after a failed wake instead of trying again
+WAKE_COOLDOWN = 15
+
+# Upper bound on probes in flight against any single target
+MAX_PROBES_PER_TARGET = 4
+
 class ProxyServer:
     """Main proxy server that manages all services"""
     
+    __slots__ = (
+        'config', 'wol_manager', 'tcp_servers', 'tcp_proxies', 'udp_proxies',
+        '_scheduler_task', '_probe_tasks', '_probe_sem', 'service_status',
+        '_wake_cooldown', '_target_probe_sems', '_probe_targets', '_starters',
+    )
+    
     def __init__(self, config: Config):
         self.config = config
         self.wol_manager = WOLManager()
         self.tcp_servers: Dict[int, asyncio.Server] = {}
+        self.tcp_proxies: Dict[int, TCPProxy] = {}
         self.udp_proxies: Dict[int, UDPProxy] = {}
-        self.health_check_tasks: List[asyncio.Task] = []
-        self.service_status: Dict[int, bool] = {}  # port -> is_available
+        self._scheduler_task: Optional[asyncio.Task] = None
+        self._probe_tasks: Set[asyncio.Task] = set()
+        self._probe_sem = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+        self.service_status: Dict[int, Tuple[bool, float]] = {}  # port -> (is_available, loop time)
+        self._wake_cooldown: Dict[int, float] = {}  # port -> loop time until which wakes are skipped
+        self._target_probe_sems: Dict[int, asyncio.Semaphore] = {}  # port -> per-target probe limit
+        self._probe_targets: Dict[int, ResolvedTarget] = {}  # port -> TCP addresses health probes connect to
+        self._starters: Dict[str, Callable[[ServiceConfig], Awaitable[None]]] = {
+            "tcp": self._start_tcp_service,
+            "udp": self._start_udp_service,
+        }
     
     async def start(self):
         """Start all proxy services"""
         logger.info("Starting proxy server")
         
-        for service in self.config.services:
-            try:
-                await self._start_service(service)
-                
-                # Start health check task
-                task = asyncio.create_task(self._health_check_loop(service))
-                self.health_check_tasks.append(task)
-                
-            except Exception as e:
-                logger.error(f"Failed to start service {service.proxy_port}: {e}")
+        # Bring services up concurrently so slow resolution or binds don't add up
+        results = await asyncio.gather(
+            *(self._start_service(service) for service in self.config.services),
+            return_exceptions=True
+        )
+        started = []
+        for service, result in zip(self.config.services, results):
+            if isinstance(result, Exception):
+                logger.error("Failed to start service %s: %s", service.proxy_port, result)
+            else:
+                started.append(service)
+        
+        # One scheduler task drives the health checks of every started service
+        if started:
+            self._scheduler_task = asyncio.create_task(self._health_check_scheduler(started))
         
-        logger.info(f"Started {len(self.config.services)} proxy services")
+        logger.info("Started %d proxy services", len(self.config.services))
     
     async def stop(self):
         """Stop all proxy services"""
         logger.info("Stopping proxy server")
         
-        # Cancel health check tasks
-        for task in self.health_check_tasks:
+        # Cancel the health check scheduler and any probes it has in flight
+        health_check_tasks = list(self._probe_tasks)
+        if self._scheduler_task:
+            health_check_tasks.append(self._scheduler_task)
+        for task in health_check_tasks:
             task.cancel()
         
-        # Stop TCP servers
-        for port, server in self.tcp_servers.items():
+        # Close all listeners first so they drain in parallel
+        for server in self.tcp_servers.values():
             server.close()
-            await server.wait_closed()
-            logger.info(f"Stopped TCP server on port {port}")
         
-        # Stop UDP proxies
-        for port, proxy in self.udp_proxies.items():
-            await proxy.stop()
-            logger.info(f"Stopped UDP proxy on port {port}")
+        # Wait for cancellations, TCP servers and UDP proxies together
+        results = await asyncio.gather(
+            *health_check_tasks,
+            *(server.wait_closed() for server in self.tcp_servers.values()),
+            *(proxy.stop() for proxy in self.udp_proxies.values()),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error("Error while stopping proxy server: %s", result)
+        
+        self.wol_manager.close()
+        
+        for port in self.tcp_servers:
+            logger.info("Stopped TCP server on port %s", port)
+        for port in self.udp_proxies:
+            logger.info("Stopped UDP proxy on port %s", port)
         
         self.tcp_servers.clear()
+        self.tcp_proxies.clear()
         self.udp_proxies.clear()
-        self.health_check_tasks.clear()
+        self._probe_targets.clear()
+        self._scheduler_task = None
+        self._probe_tasks.clear()
     
     async def _start_service(self, service: ServiceConfig):
         """Start a single proxy service"""
-        logger.info(f"Starting {service.protocol.upper()} proxy on port {service.proxy_port} -> {service.target_host}:{service.target_port}")
+        logger.info("Starting %s proxy on port %s -> %s:%s",
+                    service.protocol.upper(), service.proxy_port, service.target_host, service.target_port)
         
-        if service.protocol == "tcp":
-            await self._start_tcp_service(service)
-        elif service.protocol == "udp":
-            await self._start_udp_service(service)
+        try:
+            starter = self._starters[service.protocol]
+        except KeyError:
+            logger.error("Unknown protocol '%s' for proxy port %s", service.protocol, service.proxy_port)
+            raise
+        self._target_probe_sems[service.proxy_port] = asyncio.Semaphore(MAX_PROBES_PER_TARGET)
+        await starter(service)
+    
+    async def _resolve_target(self, proxy):
+        """Resolve a proxy's target address up front; failures fall back to lazy resolution"""
+        try:
+            await proxy.resolve()
+        except OSError as e:
+            logger.warning("Could not resolve %s:%s yet: %s", proxy.target_host, proxy.target_port, e)
     
     async def _start_tcp_service(self, service: ServiceConfig):
         """Start a TCP proxy service"""
-        async def handle_client(reader, writer):
-            await self._handle_tcp_client(service, reader, writer)
+        proxy = TCPProxy(service.target_host, service.target_port)
+        proxy.connection_timeout = service.connection_timeout
+        proxy.tcp_nodelay = service.tcp_nodelay
+        proxy.socket_buffer_size = service.socket_buffer_size
+        await self._resolve_target(proxy)
+        self.tcp_proxies[service.proxy_port] = proxy
+        self._probe_targets[service.proxy_port] = proxy
         
-        server = await asyncio.start_server(
-            handle_client,
+        async def handle_client(client_sock, client_addr):
+            await self._handle_tcp_client(service, proxy, client_sock, client_addr)
+        
+        server = await asyncio.get_running_loop().create_server(
+            lambda: TCPProxyProtocol(proxy, handle_client),
             '0.0.0.0',
             service.proxy_port
         )
         
         self.tcp_servers[service.proxy_port] = server
-        logger.info(f"TCP proxy listening on port {service.proxy_port}")
+        logger.info("TCP proxy listening on port %s", service.proxy_port)
     
     async def _start_udp_service(self, service: ServiceConfig):
         """Start a UDP proxy service"""
         proxy = UDPProxy(service.target_host, service.target_port)
+        # Availability is probed over TCP; keep those results out of the UDP proxy's address cache
+        probe_target = ResolvedTarget(service.target_host, service.target_port)
+        await asyncio.gather(self._resolve_target(proxy), self._resolve_target(probe_target))
         await proxy.start(service.proxy_port)
         self.udp_proxies[service.proxy_port] = proxy
+        self._probe_targets[service.proxy_port] = probe_target
     
-    async def _handle_tcp_client(self, service: ServiceConfig, client_reader, client_writer):
+    async def _handle_tcp_client(self, service: ServiceConfig, proxy: TCPProxy, client_sock, client_addr):
         """Handle a TCP client connection"""
-        client_addr = client_writer.get_extra_info('peername')
-        logger.info(f"New TCP connection from {client_addr} to {service.target_host}:{service.target_port}")
+        logger.info("New TCP connection from %s to %s:%s", client_addr, service.target_host, service.target_port)
         
         try:
             # Check if target is available
             if not await self._ensure_target_available(service):
-                logger.warning(f"Target {service.target_host}:{service.target_port} is not available")
-                client_writer.close()
-                await client_writer.wait_closed()
+                logger.warning("Target %s:%s is not available", service.target_host, service.target_port)
+                client_sock.close()
                 return
             
-            # Create proxy and handle connection
-            proxy = TCPProxy(service.target_host, service.target_port)
-            proxy.connection_timeout = service.connection_timeout
-            await proxy.handle_client(client_reader, client_writer)
+            # Hand the connection to the service's shared proxy, which closes the socket
+            if not await proxy.handle_client(client_sock, client_addr):
+                self._invalidate_status(service)
             
         except Exception as e:
-            logger.error(f"Error handling TCP client from {client_addr}: {e}")
-            try:
-                client_writer.close()
-                await client_writer.wait_closed()
-            except:
-                pass
+            logger.error("Error handling TCP client from %s: %s", client_addr, e)
+            client_sock.close()
     
     async def _ensure_target_available(self, service: ServiceConfig) -> bool:
         """Ensure the target service is available, waking it up if necessary"""
-        # First check if target is already available
-        if await self._check_target_availability(service.target_host, service.target_port, service.connection_timeout):
+        loop = asyncio.get_running_loop()
+        
+        # A wake just failed; don't start another one for every new client
+        if loop.time() < self._wake_cooldown.get(service.proxy_port, 0):
+            return False
+        
+        # Trust a recent "up" result from the health check instead of probing again
+        cached = self.service_status.get(service.proxy_port)
+        if cached is not None and cached[0] and loop.time() - cached[1] < min(service.health_check_interval, 5):
             return True
         
-        logger.info(f"Target {service.target_host}:{service.target_port} is not available, attempting WOL")
+        # Otherwise check if target is already available
+        if await self._check_target_availability(service, join_wake=True):
+            self.service_status[service.proxy_port] = (True, loop.time())
+            return True
+        
+        logger.info("Target %s:%s is not available, attempting WOL", service.target_host, service.target_port)
         
         # Try to wake up the target
         success = await self.wol_manager.wake_host(
-            service.mac_address,
-            service.target_host,
-            service.target_port,
-            service.wake_timeout
+            service.mac_bytes,
+            self._target_for(service),
+            service.wake_timeout,
+            skip_initial_check=True
         )
         
+        if success:
+            self.service_status[service.proxy_port] = (True, loop.time())
+        else:
+            self._wake_cooldown[service.proxy_port] = loop.time() + WAKE_COOLDOWN
         return success
     
-    async def _check_target_availability(self, host: str, port: int, timeout: int = 5) -> bool:
-        """Check if target service is available"""
-        try:
-            future = asyncio.open_connection(host, port)
-            reader, writer = await asyncio.wait_for(future, timeout=timeout)
-            writer.close()
-            await writer.wait_closed()
-            return True
-        except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
-            return False
-        except Exception as e:
-            logger.debug(f"Unexpected error checking {host}:{port}: {e}")
+    def _invalidate_status(self, service: ServiceConfig):
+        """Force the next client to probe the target instead of trusting the cached status"""
+        cached = self.service_status.get(service.proxy_port)
+        if cached is not None:
+            self.service_status[service.proxy_port] = (cached[0], float('-inf'))
+    
+    def _target_for(self, service: ServiceConfig) -> ResolvedTarget:
+        """Return the resolved TCP target that availability probes connect to"""
+        return self._probe_targets[service.proxy_port]
+    
+    async def _check_target_availability(self, service: ServiceConfig, join_wake: bool = False) -> bool:
+        """Check if target service is available, capping concurrent probes per target
+        
+        With join_wake, report the target as unavailable without probing while a
+        wake of it is in flight, so the caller joins that wake instead of queueing.
+        """
+        target = self._target_for(service)
+        if join_wake and self.wol_manager.is_waking(target):
             return False
+        
+        sem = self._target_probe_sems[service.proxy_port]
+        if sem.locked():
+            logger.debug("All %d probe slots for %s:%s in use, queueing",
+                         MAX_PROBES_PER_TARGET, service.target_host, service.target_port)
+        async with sem:
+            # A wake may have started while we waited for a slot
+            if join_wake and self.wol_manager.is_waking(target):
+                return False
+            return await tcp_probe(target, service.connection_timeout)
     
-    async def _health_check_loop(self, service: ServiceConfig):
-        """Continuously monitor target service health"""
-        logger.info(f"Starting health check for {service.target_host}:{service.target_port}")
-        
-        while True:
-            try:
-                is_available = await self._check_target_availability(
-                    service.target_host, 
-                    service.target_port,
-                    service.connection_timeout
-                )
-                
-                # Update status
-                prev_status = self.service_status.get(service.proxy_port, None)
-                self.service_status[service.proxy_port] = is_available
-                
-                # Log status changes
-                if prev_status is not None and prev_status != is_available:
-                    status_str = "available" if is_available else "unavailable"
-                    logger.info(f"Target {service.target_host}:{service.target_port} is now {status_str}")
+    async def _health_check_scheduler(self, services: List[ServiceConfig]):
+        """Probe every service on its own interval from a single task"""
+        loop = asyncio.get_running_loop()
+        
+        # Min-heap of (next deadline, tie-breaker, service); ServiceConfig isn't orderable
+        heap = [(loop.time(), index, service) for index, service in enumerate(services)]
+        heapq.heapify(heap)
+        in_flight: Dict[int, asyncio.Task] = {}
+        
+        for service in services:
+            logger.info("Starting health check for %s:%s", service.target_host, service.target_port)
+        
+        try:
+            while True:
+                deadline, index, service = heapq.heappop(heap)
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
                 
-                await asyncio.sleep(service.health_check_interval)
+                # Skip this cycle if the previous probe of this service is still running
+                previous = in_flight.get(index)
+                if previous is None or previous.done():
+                    task = asyncio.create_task(self._probe_and_update(service))
+                    in_flight[index] = task
+                    self._probe_tasks.add(task)
+                    task.add_done_callback(self._probe_tasks.discard)
                 
-            except asyncio.CancelledError:
-                logger.info(f"Health check cancelled for {service.target_host}:{service.target_port}")
-                break
-            except Exception as e:
-                logger.error(f"Error in health check for {service.target_host}:{service.target_port}: {e}")
-                await asyncio.sleep(service.health_check_interval)
+                # Keep a fixed rate, but don't try to catch up on missed cycles
+                next_deadline = max(deadline + service.health_check_interval, loop.time() + 0.5)
+                heapq.heappush(heap, (next_deadline, index, service))
+        
+        except asyncio.CancelledError:
+            logger.info("Health checks cancelled")
+            raise
+    
+    async def _probe_and_update(self, service: ServiceConfig):
+        """Probe one service and record its availability"""
+        try:
+            async with self._probe_sem:
+                is_available = await self._check_target_availability(service)
+            
+            # Update status
+            prev = self.service_status.get(service.proxy_port)
+            prev_status = prev[0] if prev is not None else None
+            self.service_status[service.proxy_port] = (is_available, asyncio.get_running_loop().time())
+            if is_available:
+                self._wake_cooldown.pop(service.proxy_port, None)
+            
+            # Log status changes
+            if prev_status is not None and prev_status != is_available:
+                status_str = "available" if is_available else "unavailable"
+                logger.info("Target %s:%s is now %s", service.target_host, service.target_port, status_str)
+        
+        except Exception as e:
+            logger.error("Error in health check for %s:%s: %s", service.target_host, service.target_port, e)
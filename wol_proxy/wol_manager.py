@@ -4,52 +4,101 @@ Wake-on-LAN functionality
 
 import asyncio
 import logging
+import random
 import socket
-from wakeonlan import send_magic_packet
+from typing import Dict, Optional
+
+from .probe import tcp_probe
+from .proxy import ResolvedTarget
 
 logger = logging.getLogger(__name__)
 
+# Probe schedule (seconds) while waiting for a woken host to come up
+WAKE_PROBE_INITIAL_DELAY = 0.25
+WAKE_PROBE_MAX_DELAY = 4.0
+WAKE_PROBE_BACKOFF = 1.7
+WAKE_PROBE_JITTER = 0.1
+
+# Magic packets go to the limited broadcast address on the standard discard port
+WOL_BROADCAST_ADDRESS = "255.255.255.255"
+WOL_PORT = 9
+
 class WOLManager:
     """Manages Wake-on-LAN operations"""
     
+    __slots__ = ('_waking_hosts', '_wake_results', '_wol_sock')
+    
     def __init__(self):
-        self._waking_hosts = set()
+        # host_key -> event set when the in-flight wake attempt finishes
+        self._waking_hosts: Dict[str, asyncio.Event] = {}
+        # host_key -> outcome of the most recent wake attempt
+        self._wake_results: Dict[str, bool] = {}
+        # Broadcast socket reused for every magic packet; opened on first use
+        self._wol_sock: Optional[socket.socket] = None
+    
+    def close(self):
+        """Close the cached broadcast socket"""
+        if self._wol_sock is not None:
+            self._wol_sock.close()
+            self._wol_sock = None
     
-    async def wake_host(self, mac_address: str, target_host: str, target_port: int, timeout: int = 60) -> bool:
+    def is_waking(self, target: ResolvedTarget) -> bool:
+        """Return whether a wake attempt for the target is in flight"""
+        return self._host_key(target) in self._waking_hosts
+    
+    @staticmethod
+    def _host_key(target: ResolvedTarget) -> str:
+        return f"{target.target_host}:{target.target_port}"
+    
+    async def wake_host(self, mac_bytes: bytes, target: ResolvedTarget, timeout: int = 60,
+                        skip_initial_check: bool = False) -> bool:
         """
         Wake up a host using WOL and wait for it to be available
         
+        Concurrent calls for the same host share a single wake attempt.
+        
         Args:
-            mac_address: MAC address of the target host
-            target_host: IP address or hostname of the target
-            target_port: Port to check for availability
+            mac_bytes: Raw 6-byte MAC address of the target host
+            target: The service's proxy, whose cached addresses are probed for availability
             timeout: Maximum time to wait for host to wake up
+            skip_initial_check: Send the packet straight away; the caller has just
+                found the host unreachable
             
         Returns:
             True if host woke up successfully, False otherwise
         """
-        host_key = f"{target_host}:{target_port}"
+        target_host, target_port = target.target_host, target.target_port
+        host_key = self._host_key(target)
         
-        # Check if we're already trying to wake this host
-        if host_key in self._waking_hosts:
+        # If we're already trying to wake this host, wait for that attempt instead of probing
+        event = self._waking_hosts.get(host_key)
+        if event is not None:
             logger.info(f"Already attempting to wake {target_host}, waiting...")
-            return await self._wait_for_host(target_host, target_port, timeout)
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+            return self._wake_results.get(host_key, False)
         
-        # Check if host is already awake
-        if await self._check_host_availability(target_host, target_port):
-            logger.debug(f"Host {target_host}:{target_port} is already awake")
-            return True
+        event = asyncio.Event()
+        self._waking_hosts[host_key] = event
+        success = False
         
         try:
-            self._waking_hosts.add(host_key)
-            logger.info(f"Sending WOL packet to {mac_address} for host {target_host}")
+            # Check if host is already awake
+            if not skip_initial_check and await self._check_host_availability(target):
+                logger.debug(f"Host {target_host}:{target_port} is already awake")
+                success = True
+                return success
+            
+            logger.info(f"Sending WOL packet to {mac_bytes.hex(':')} for host {target_host}")
             
             # Send WOL packet
-            send_magic_packet(mac_address)
+            self._send_magic_packet(mac_bytes)
             
             # Wait for host to wake up
             logger.info(f"Waiting for {target_host}:{target_port} to become available (timeout: {timeout}s)")
-            success = await self._wait_for_host(target_host, target_port, timeout)
+            success = await self._wait_for_host(target, timeout)
             
             if success:
                 logger.info(f"Successfully woke up {target_host}:{target_port}")
@@ -62,30 +111,44 @@ class WOLManager:
             logger.error(f"Error waking host {target_host}: {e}")
             return False
         finally:
-            self._waking_hosts.discard(host_key)
+            # Publish the outcome before releasing waiters
+            self._wake_results[host_key] = success
+            event.set()
+            del self._waking_hosts[host_key]
     
-    async def _wait_for_host(self, host: str, port: int, timeout: int) -> bool:
-        """Wait for a host to become available"""
-        start_time = asyncio.get_event_loop().time()
-        check_interval = 2  # Check every 2 seconds
+    def _send_magic_packet(self, mac_bytes: bytes):
+        """Broadcast a Wake-on-LAN magic packet for the given raw MAC address"""
+        if len(mac_bytes) != 6:
+            raise ValueError(f"Invalid MAC address: {mac_bytes.hex(':')}")
         
-        while (asyncio.get_event_loop().time() - start_time) < timeout:
-            if await self._check_host_availability(host, port):
-                return True
-            await asyncio.sleep(check_interval)
+        if self._wol_sock is None:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            sock.setblocking(False)
+            self._wol_sock = sock
         
-        return False
+        # Six 0xFF bytes followed by the MAC repeated 16 times. The socket is
+        # non-blocking and already set up, so this needs no executor hop.
+        self._wol_sock.sendto(b"\xff" * 6 + mac_bytes * 16, (WOL_BROADCAST_ADDRESS, WOL_PORT))
     
-    async def _check_host_availability(self, host: str, port: int) -> bool:
-        """Check if a host is available on the specified port"""
-        try:
-            future = asyncio.open_connection(host, port)
-            reader, writer = await asyncio.wait_for(future, timeout=5)
-            writer.close()
-            await writer.wait_closed()
-            return True
-        except (asyncio.TimeoutError, ConnectionRefusedError, OSError):
-            return False
-        except Exception as e:
-            logger.debug(f"Unexpected error checking {host}:{port}: {e}")
-            return False
+    async def _wait_for_host(self, target: ResolvedTarget, timeout: int) -> bool:
+        """Wait for a host to become available, probing with exponential backoff"""
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        delay = WAKE_PROBE_INITIAL_DELAY
+        
+        while True:
+            remaining = timeout - (loop.time() - start_time)
+            if remaining <= 0:
+                return False
+            
+            await asyncio.sleep(min(delay, remaining))
+            if await self._check_host_availability(target):
+                return True
+            
+            # Back off so a still-booting host isn't flooded with SYNs
+            delay = min(delay * WAKE_PROBE_BACKOFF, WAKE_PROBE_MAX_DELAY) + random.uniform(0, WAKE_PROBE_JITTER)
+    
+    async def _check_host_availability(self, target: ResolvedTarget) -> bool:
+        """Check if a target host is available on its port"""
+        return await tcp_probe(target, timeout=5)